@@ -1,15 +1,121 @@
 import pyparsing as pp
+from weakref import WeakValueDictionary
 
-from typing import Iterable, Any, TYPE_CHECKING, Union, Optional, Tuple
+from typing import (
+    Iterable,
+    Any,
+    TYPE_CHECKING,
+    Union,
+    Optional,
+    Tuple,
+    List,
+    Callable,
+    Dict,
+)
 
 if TYPE_CHECKING:
     from ._expression import ClassAd
     from ._primitives import Undefined, Error, HTCBool
 
+# kinds of steps in the evaluation plan of an expression
+VALUE, EVALUATE, CALL = range(3)
+
+#: step of an evaluation plan as ``(slot, kind, operation, operand slots)``
+PlanStep = Tuple[int, int, Union["Expression", Callable], Tuple[int, ...]]
+
+#: factories of evaluation functions by the structure of their plan
+_factories: Dict[Tuple[Tuple[int, Tuple[int, ...]], ...], Callable] = {}
+
+
+def _generate(plan: Tuple[PlanStep, ...]) -> Callable[..., "Expression"]:
+    """
+    Generate a function evaluating `plan` without interpreting its steps
+
+    Code is generated once for each structure of plans, so that expressions
+    only differing in their operands share the same code.
+    """
+    structure = tuple((kind, operands) for _, kind, _, operands in plan)
+    try:
+        factory = _factories[structure]
+    except KeyError:
+        # operations are passed as one argument, as Python before 3.7 does
+        # not allow functions with more than 255 parameters
+        lines = ["def factory(operations):"]
+        lines.extend(f"    x{slot} = operations[{slot}]" for slot in range(len(plan)))
+        lines += [
+            "    def evaluate(key=None, my=None, target=None):",
+            "        if isinstance(key, str):",
+            "            key = tuple(key.split('.'))",
+        ]
+        for slot, (kind, operands) in enumerate(structure):
+            if kind == VALUE:
+                lines.append(f"        s{slot} = x{slot}")
+            elif kind == EVALUATE:
+                lines.append(
+                    f"        s{slot} = x{slot}._evaluate("
+                    "key=key, my=my, target=target)"
+                )
+            else:
+                arguments = ", ".join(f"s{operand}" for operand in operands)
+                lines.append(f"        s{slot} = x{slot}({arguments})")
+        lines.append(f"        return s{len(plan) - 1}")
+        lines.append("    return evaluate")
+        namespace = {}
+        exec(compile("\n".join(lines), "<classad plan>", "exec"), namespace)
+        factory = _factories[structure] = namespace["factory"]
+    return factory(tuple(operation for _, _, operation, _ in plan))
+
 
 class Expression:
     __slots__ = ()
 
+    def compile(self) -> Tuple[PlanStep, ...]:
+        """
+        Flatten the expression to a plan of steps in topological order
+
+        Each step computes the value of one slot from the values of the slots
+        of its operands, which always precede it. The value of the expression
+        is the value of the last slot.
+        """
+        plan = []
+        self._compile(plan)
+        return tuple(plan)
+
+    def _compile(self, plan: List[PlanStep]) -> int:
+        """Add the steps to compute this expression to `plan` and return its slot"""
+        slot = len(plan)
+        plan.append((slot, EVALUATE, self, ()))
+        return slot
+
+    def jit(self) -> Callable[..., "Expression"]:
+        """
+        Generate a function evaluating the expression by its :py:meth:`compile` plan
+
+        The function takes the same arguments as :py:meth:`evaluate`.
+        """
+        return _generate(self.compile())
+
+    def evaluate_batch(
+        self,
+        key: "Optional[Iterable[Union[str, CompoundExpression]]]" = None,
+        my: "Optional[ClassAd]" = None,
+        targets: "Iterable[ClassAd]" = (),
+    ) -> "List[Expression]":
+        """
+        Evaluate the expression in context of `my` against each of `targets`
+
+        The expression is compiled once by :py:meth:`jit` for all targets.
+        """
+        if isinstance(key, str):
+            key = tuple(key.split("."))
+        plan = self.compile()
+        if len(plan) == 1 and plan[0][1] == EVALUATE:
+            # a single lazy step gains nothing from generated code
+            evaluate = plan[0][2]._evaluate
+        else:
+            evaluate = self.jit()
+        return [evaluate(key, my, target) for target in targets]
+
     def evaluate(
         self,
         key: "Optional[Iterable[Union[str, CompoundExpression]]]" = None,
@@ -32,10 +138,25 @@ class Expression:
 
 
 class CompoundExpression(Expression):
-    __slots__ = "_expression"
+    __slots__ = ("_expression", "_plan", "_jit", "_structure_key", "__weakref__")
 
     _expression: Tuple[Expression, ...]
 
+    def compile(self) -> Tuple[PlanStep, ...]:
+        # expressions are not modified after parsing, so the plan never changes
+        try:
+            return self._plan
+        except AttributeError:
+            self._plan = super().compile()
+            return self._plan
+
+    def jit(self) -> Callable[..., "Expression"]:
+        try:
+            return self._jit
+        except AttributeError:
+            self._jit = super().jit()
+            return self._jit
+
     def evaluate(
         self,
         key: "Optional[Iterable[Union[str, CompoundExpression]]]" = None,
@@ -43,7 +164,7 @@ class CompoundExpression(Expression):
         target: "Optional[ClassAd]" = None,
     ) -> "Expression":
         if isinstance(key, str):
-            key = key.split(".")
+            key = tuple(key.split("."))
         return self._evaluate(key=key, my=my, target=target)
 
     def _evaluate(
@@ -75,12 +196,34 @@ class CompoundExpression(Expression):
         return f"<{self.__class__.__name__}>: {self._expression}"
 
     def __eq__(self, other):
-        return type(self) == type(other) and self._expression == other._expression
+        return (
+            self.__class__ is other.__class__ and self._expression == other._expression
+        )
+
+    def __hash__(self):
+        return hash((type(self), self._expression))
+
+    def _structure(self) -> Any:
+        """Key identifying the expression by the exact types and values it contains"""
+        try:
+            return self._structure_key
+        except AttributeError:
+            self._structure_key = type(self), _structure(self._structure_items())
+            return self._structure_key
+
+    def _structure_items(self) -> Any:
+        """Content of the expression that defines its structure"""
+        return self._expression
 
 
 class PrimitiveExpression(Expression):
     __slots__ = ()
 
+    def _compile(self, plan: List[PlanStep]) -> int:
+        slot = len(plan)
+        plan.append((slot, VALUE, self, ()))
+        return slot
+
     def evaluate(
         self,
         key: Optional[Iterable[Union[str, CompoundExpression]]] = None,
@@ -155,3 +298,34 @@ class PrimitiveExpression(Expression):
             parse("(10 != Undefined)").evaluate()  # result: Undefined
         """
         return NotImplemented
+
+
+def _structure(item: Any) -> Any:
+    if isinstance(item, CompoundExpression):
+        # sub-expressions are interned before the expressions containing them,
+        # so keys can refer to them by identity instead of nesting their keys
+        item._structure()
+        return type(item), id(item)
+    elif isinstance(item, tuple):
+        return type(item), tuple(_structure(element) for element in item)
+    return type(item), item
+
+
+#: interned expressions by their structure
+_interned: "WeakValueDictionary[Any, CompoundExpression]" = WeakValueDictionary()
+
+
+def intern_expression(expression: Expression) -> Expression:
+    """
+    Replace `expression` by a structurally identical expression parsed before
+
+    Identical expressions, e.g. requirements repeated in many ClassAds, then
+    share a single object and its cached evaluation plans. Expressions that
+    contain mutable ClassAds are never interned.
+    """
+    if not isinstance(expression, CompoundExpression):
+        return expression
+    try:
+        return _interned.setdefault(expression._structure(), expression)
+    except TypeError:
+        return expression
@@ -1,21 +1,42 @@
 import operator
 from collections import MutableMapping
+from functools import partial
 
 import pyparsing as pp
-from typing import Iterable, List, Iterator, Optional, Union, Tuple
-
-from classad._operator import eq_operator, ne_operator, not_operator, neg_operator
+from typing import Iterable, Iterator, List, Optional, Union, Tuple
+
+from classad._operator import (
+    eq_operator,
+    ne_operator,
+    not_operator,
+    neg_operator,
+    and_operator,
+    or_operator,
+    and_short_circuit,
+    or_short_circuit,
+)
 from classad._primitives import Error, Undefined, HTCBool
-from ._base_expression import CompoundExpression, Expression
+from ._base_expression import (
+    CompoundExpression,
+    Expression,
+    PrimitiveExpression,
+    PlanStep,
+    CALL,
+)
 from . import _functions
 
+_undefined = Undefined()
+
 
-def scope_up(key: List[str]):
+def scope_up(key: Tuple[str, ...]) -> Tuple[str, ...]:
     return key[:-1]
 
 
 class ClassAd(CompoundExpression, MutableMapping):
-    __slots__ = "_data"
+    __slots__ = ("_data", "_lookups", "_lookups_generation")
+
+    #: number of modifications of any ClassAd, invalidates cached lookups
+    _generation = 0
 
     def __add__(self, other):
         return Error()
@@ -25,6 +46,8 @@ class ClassAd(CompoundExpression, MutableMapping):
     def __init__(self):
         super().__init__()
         self._data = dict()
+        self._lookups = dict()
+        self._lookups_generation = ClassAd._generation
 
     def __setitem__(
         self, key: Union[str, CompoundExpression], value: Expression
@@ -33,6 +56,11 @@ class ClassAd(CompoundExpression, MutableMapping):
         Keynames that are reserved and, therefore, cannot be used: error, false, is,
             isnt, parent, true, undefined
         """
+        self._store(key, value)
+        ClassAd._generation += 1
+
+    def _store(self, key: Union[str, CompoundExpression], value: Expression) -> None:
+        """Store an attribute without invalidating cached lookups"""
         try:
             key = key.casefold()
         except AttributeError:
@@ -43,6 +71,7 @@ class ClassAd(CompoundExpression, MutableMapping):
 
     def __delitem__(self, key: Union[str, CompoundExpression]) -> None:
         self._data.pop(key, None)
+        ClassAd._generation += 1
 
     def __getitem__(self, key: Iterable[Union[str, CompoundExpression]]) -> Expression:
         if isinstance(key, str):
@@ -59,6 +88,37 @@ class ClassAd(CompoundExpression, MutableMapping):
     def __len__(self) -> int:
         return len(self._data)
 
+    def _lookup(
+        self, key: Optional[Iterable[str]], name: Union[str, Tuple[str, ...]]
+    ) -> Tuple[Tuple[str, ...], Expression]:
+        """
+        Lookup the attribute `name` in the scope `key`, climbing up to the
+        enclosing scopes until it is defined.
+
+        Returns the key of the scope defining the attribute and its value. As
+        the same lookups are repeated for every matchmaking, results are cached
+        until any ClassAd is modified.
+        """
+        if not key:
+            key = ()
+        elif type(key) is not tuple:
+            key = (key,) if isinstance(key, str) else tuple(key)
+        if self._lookups_generation != ClassAd._generation:
+            self._lookups.clear()
+            self._lookups_generation = ClassAd._generation
+        try:
+            return self._lookups[key, name]
+        except KeyError:
+            pass
+        scope_key = key
+        while True:
+            value = (self[scope_key] if scope_key else self)[name]
+            if not scope_key or value is not _undefined:
+                break
+            scope_key = scope_up(scope_key)
+        self._lookups[key, name] = result = (scope_key, value)
+        return result
+
     def __iter__(self) -> Iterator[str]:
         return iter(self._data)
 
@@ -78,15 +138,33 @@ class ClassAd(CompoundExpression, MutableMapping):
         new_key = key[:-1]
         return expression._evaluate(key=new_key, my=self, target=target)
 
+    def evaluate_batch(
+        self,
+        key: Optional[Iterable[Union[str, CompoundExpression]]] = None,
+        my: "Optional[ClassAd]" = None,
+        targets: "Iterable[ClassAd]" = (),
+    ) -> List[Expression]:
+        if isinstance(key, str):
+            key = tuple(key.split("."))
+        if key is None:
+            return [self for _ in targets]
+        # resolve the attribute once instead of for every target
+        expression = self[key]
+        return expression.evaluate_batch(key=key[:-1], my=self, targets=targets)
+
     @classmethod
     def from_grammar(cls, tokens):
         result = cls()
+        # a new ClassAd cannot be part of any cached lookup yet
         for token in tokens:
-            result[token[0]] = token[1]
+            result._store(token[0], token[1])
         return result
 
     def __eq__(self, other):
-        return HTCBool(type(self) == type(other) and self._data == other._data)
+        return HTCBool(self.__class__ is other.__class__ and self._data == other._data)
+
+    def _structure(self):
+        raise TypeError("ClassAds are mutable and have no fixed structure")
 
     def __repr__(self):
         return f"<{self.__class__.__name__}>: {self._data}"
@@ -104,31 +182,69 @@ class NamedExpression(CompoundExpression):
         return result
 
 
+def _unknown_function(name: str, *args):
+    raise AttributeError(f"unknown function {name!r}")
+
+
 class FunctionExpression(CompoundExpression):
-    __slots__ = ("_name",)
+    __slots__ = ("_name", "_function", "_positions", "_cacheable", "_result")
+
+    #: functions whose result may change even for the same arguments
+    impure_functions = {"random", "time", "formatTime", "debug", "userHome", "userMap"}
 
     def __init__(self, name: str, args: Tuple[Expression, ...]):
         super().__init__()
         self._name = name
         self._expression = args
+        try:
+            self._function = getattr(_functions, name)
+        except AttributeError:
+            # unknown functions only fail once they are evaluated
+            self._function = partial(_unknown_function, name)
+        # only arguments that are not literals need to be evaluated
+        self._positions = tuple(
+            position
+            for position, element in enumerate(args)
+            if not isinstance(element, PrimitiveExpression)
+        )
+        self._cacheable = not self._positions and name not in self.impure_functions
+        self._result = None
 
     def __eq__(self, other):
         return (
-            type(self) == type(other)
+            self.__class__ is other.__class__
             and self._expression == other._expression
             and self._name == other._name
         )
 
+    def __hash__(self):
+        return hash((type(self), self._name, self._expression))
+
+    def _structure_items(self):
+        return self._name, self._expression
+
     def _evaluate(
         self,
         key: Optional[Iterable[Union[str, CompoundExpression]]] = None,
         my: "Optional[ClassAd]" = None,
         target: "Optional[ClassAd]" = None,
     ) -> Expression:
-        expression = []
-        for element in self._expression:
-            expression.append(element._evaluate(key=key, my=my, target=target))
-        return getattr(_functions, self._name)(*expression)
+        if self._cacheable:
+            if self._result is None:
+                self._result = self._function(*self._expression)
+            return self._result
+        arguments = list(self._expression)
+        for position in self._positions:
+            arguments[position] = arguments[position]._evaluate(
+                key=key, my=my, target=target
+            )
+        return self._function(*arguments)
+
+    def _compile(self, plan: List[PlanStep]) -> int:
+        operands = tuple(element._compile(plan) for element in self._expression)
+        slot = len(plan)
+        plan.append((slot, CALL, self._function, operands))
+        return slot
 
     @classmethod
     def from_grammar(cls, tokens):
@@ -150,22 +266,26 @@ class TernaryExpression(CompoundExpression):
         predicate, if_true, if_false = self._expression
         result = predicate._evaluate(key=key, my=my, target=target)
         if if_true is None:
-            if isinstance(result, Undefined):
+            if result is _undefined:
                 return if_false._evaluate(key=key, my=my, target=target)
             else:
                 return result
-        if isinstance(result, Undefined):
+        if result is _undefined:
             return Undefined()
         if isinstance(result, HTCBool):
-            if result:
-                return if_true._evaluate(key=key, my=my, target=target)
-            elif not result:
-                return if_false._evaluate(key=key, my=my, target=target)
+            # only the branch that is taken is evaluated
+            branch = if_true if result else if_false
+            return branch._evaluate(key=key, my=my, target=target)
         return Error()
 
 
 class DotExpression(CompoundExpression):
-    __slots__ = ()
+    __slots__ = ("_resolution", "_generation")
+
+    def __init__(self):
+        super().__init__()
+        self._resolution = None
+        self._generation = None
 
     def _evaluate(
         self,
@@ -174,26 +294,42 @@ class DotExpression(CompoundExpression):
         target: "Optional[ClassAd]" = None,
     ) -> Expression:
         scope = self._expression[0]
-        checked = set()
-        to_check = self._expression[1]
+        # the references within the scope only change if any ClassAd is modified
+        if self._generation != ClassAd._generation:
+            checked = set()
+            result = self._follow(scope, self._expression[1], checked)
+            self._resolution = result, frozenset(checked)
+            self._generation = ClassAd._generation
+        result, checked = self._resolution
+        if not isinstance(result, AttributeExpression):
+            return result
+        try:
+            new_scope = my[key]
+        except TypeError:
+            return Undefined()
+        if new_scope == scope:
+            return Undefined()
+        result = self._follow(new_scope, result, set(checked - {result._expression}))
+        if isinstance(result, AttributeExpression):
+            return Undefined()
+        return result
+
+    @staticmethod
+    def _follow(scope: ClassAd, to_check: Expression, checked: set) -> Expression:
+        """
+        Follow the attribute references starting at `to_check` within `scope`
+
+        Returns the referenced value, :py:class:`~.Undefined` for circular
+        references, or the attribute expression not defined in `scope`.
+        """
         while isinstance(to_check, AttributeExpression):
-            if to_check._expression not in checked:
-                checked.add(to_check._expression)
-                result = scope[to_check._expression]
-                if not isinstance(result, Undefined):
-                    to_check = result
-                else:
-                    try:
-                        new_scope = my[key]
-                    except TypeError:
-                        return Undefined()
-                    if new_scope != scope:
-                        checked.remove(to_check._expression)
-                        scope = new_scope
-                    else:
-                        return Undefined()
-            else:
+            if to_check._expression in checked:
                 return Undefined()
+            checked.add(to_check._expression)
+            result = scope[to_check._expression]
+            if result is _undefined:
+                return to_check
+            to_check = result
         return to_check
 
 
@@ -211,8 +347,12 @@ class SubscriptableExpression(CompoundExpression):
         return operand[index]._evaluate(key=key, my=my, target=target)
 
 
+# kinds of references of attribute expressions
+PLAIN, ABSOLUTE, TARGET, MY = range(4)
+
+
 class AttributeExpression(CompoundExpression):
-    __slots__ = ()
+    __slots__ = ("_kind", "_scope", "_name")
 
     def _evaluate(
         self,
@@ -220,53 +360,31 @@ class AttributeExpression(CompoundExpression):
         my: "Optional[ClassAd]" = None,
         target: "Optional[ClassAd]" = None,
     ) -> Expression:
-        def find_scope(current_key, classad=my):
-            if len(current_key) > 0:
-                return classad[current_key]
-            return classad
-
+        kind = self._kind
         the_key = key
         selected_classad = my
-        value = Undefined()
-        if self._expression[0] == ".":
-            the_key = scope_up(self._expression[1])
-            expression = self._expression[1][-1]
-        elif self._expression[0] == "target":
+        if kind == ABSOLUTE:
+            the_key = self._scope
+        elif kind == TARGET:
             if target is None:
                 return Undefined()
             selected_classad = target
-            expression = self._expression[1]
-        elif self._expression[0] == "my":
+        elif kind == MY:
             if my is None:
                 return Undefined()
-            expression = self._expression[1]
-        else:
-            expression = self._expression
+        if selected_classad is None:
+            return Error()
         try:
-            if the_key is None and selected_classad is not None:
-                context = selected_classad
-            else:
-                context = find_scope(the_key, classad=selected_classad)
+            the_key, value = selected_classad._lookup(the_key, self._name)
+            if (
+                value is _undefined
+                and kind == PLAIN
+                and target is not None
+                and selected_classad != target
+            ):
+                the_key, value = target._lookup(key, self._name)
         except TypeError:
             return Error()
-        while isinstance(value, Undefined):
-            value = context[expression]
-            if isinstance(value, Undefined):
-                if len(the_key) == 0:
-                    if (
-                        target is not None
-                        and self._expression[0] != "."
-                        and self._expression[0] != "target"
-                        and self._expression[0] != "my"
-                        and selected_classad != target
-                    ):
-                        selected_classad = target
-                        the_key = key
-                        context = find_scope(the_key, classad=selected_classad)
-                        continue
-                    return Undefined()
-                the_key = scope_up(the_key)
-                context = find_scope(the_key, classad=selected_classad)
         if isinstance(value, AttributeExpression):
             return value._evaluate(key=the_key, my=my, target=target)
         return value
@@ -279,7 +397,11 @@ class AttributeExpression(CompoundExpression):
                 result = DotExpression()
                 result._expression = tuple(tokens)
             elif isinstance(tokens[0], str) and tokens[0] == ".":
-                result._expression = tuple([tokens[0], tokens[1]._expression])
+                # store the absolute reference as segments to split its scope
+                segments = tokens[1]._expression
+                if isinstance(segments, str):
+                    segments = (segments,)
+                result._expression = (tokens[0], segments)
             elif isinstance(tokens[0], NamedExpression):
                 result._expression = tuple(
                     [tokens[0]._expression, tokens[1]._expression]
@@ -291,8 +413,28 @@ class AttributeExpression(CompoundExpression):
                     result._expression = tokens[0]._expression
         else:
             result._expression = tokens
+        if isinstance(result, AttributeExpression):
+            result._resolve_reference()
         return result
 
+    def _resolve_reference(self):
+        """Split the reference into its kind, scope and attribute name once"""
+        reference = self._expression
+        self._scope = None
+        if reference[0] == ".":
+            self._kind = ABSOLUTE
+            self._scope = scope_up(reference[1])
+            self._name = reference[1][-1]
+        elif reference[0] == "target":
+            self._kind = TARGET
+            self._name = reference[1]
+        elif reference[0] == "my":
+            self._kind = MY
+            self._name = reference[1]
+        else:
+            self._kind = PLAIN
+            self._name = reference
+
 
 class UnaryExpression(CompoundExpression):
     __slots__ = ()
@@ -308,9 +450,15 @@ class UnaryExpression(CompoundExpression):
         operand = self._expression[1]._evaluate(key=key, my=my, target=target)
         return self.operator_map[self._expression[0]](operand)
 
+    def _compile(self, plan: List[PlanStep]) -> int:
+        operand = self._expression[1]._compile(plan)
+        slot = len(plan)
+        plan.append((slot, CALL, self.operator_map[self._expression[0]], (operand,)))
+        return slot
+
 
 class ArithmeticExpression(CompoundExpression):
-    __slots__ = ()
+    __slots__ = ("_steps",)
 
     operator_map = {
         "+": operator.add,
@@ -323,32 +471,20 @@ class ArithmeticExpression(CompoundExpression):
         ">": operator.gt,
         "==": eq_operator,
         "!=": ne_operator,
-        "&&": operator.and_,
-        "||": operator.or_,
+        "&&": and_operator,
+        "||": or_operator,
         "=!=": operator.ne,
         "isnt": operator.ne,
         "=?=": operator.eq,
         "is": operator.eq,
     }
-
-    def _calculate(self, first, second, operand) -> Expression:
-        try:
-            return self.operator_map[operand](first, second)
-        except (ArithmeticError, AttributeError, TypeError):
-            return Error()
-
-    def __eq__(self, other):
-        if type(self) == type(other):
-            # check operators
-            return all(
-                (
-                    self._expression[0] == other._expression[0],
-                    self.operator_map[self._expression[1]]
-                    == self.operator_map[other._expression[1]],
-                    self._expression[2] == other._expression[2],
-                )
-            )
-        return False
+    #: alternative spellings of operators
+    operator_aliases = {"=!=": "isnt", "=?=": "is"}
+    #: operators that never raise, since any expression can be compared for identity
+    #: or is part of the three-valued logic
+    unguarded_operators = {"=!=", "isnt", "=?=", "is", "&&", "||"}
+    #: operators that may not need to evaluate their second operand
+    short_circuit_map = {"&&": and_short_circuit, "||": or_short_circuit}
 
     def _evaluate(
         self,
@@ -357,9 +493,62 @@ class ArithmeticExpression(CompoundExpression):
         target: "Optional[ClassAd]" = None,
     ) -> Expression:
         result = self._expression[0]._evaluate(key=key, my=my, target=target)
-        for position in range(0, len(self._expression) - 1, 2):
-            second = self._expression[position + 2]._evaluate(
-                key=key, my=my, target=target
+        for operation, guarded, short_circuit, operand in self._steps:
+            if short_circuit is not None:
+                fixed = short_circuit(result)
+                if fixed is not None:
+                    result = fixed
+                    continue
+            second = operand._evaluate(key=key, my=my, target=target)
+            if not guarded:
+                result = operation(result, second)
+                continue
+            try:
+                result = operation(result, second)
+            except (ArithmeticError, AttributeError, TypeError):
+                result = Error()
+        return result
+
+    def _compile(self, plan: List[PlanStep]) -> int:
+        if any(short_circuit is not None for _, _, short_circuit, _ in self._steps):
+            # the second operand must only be evaluated if the first does not
+            # already decide the result, so keep a lazy step like for ternaries
+            return super()._compile(plan)
+        slot = self._expression[0]._compile(plan)
+        for operation, guarded, _, operand in self._steps:
+            second = operand._compile(plan)
+            if guarded:
+                operation = partial(_calculate, operation)
+            plan.append((len(plan), CALL, operation, (slot, second)))
+            slot = len(plan) - 1
+        return slot
+
+    @classmethod
+    def from_grammar(cls, tokens):
+        result = super().from_grammar(tokens)
+        if isinstance(result, cls):
+            # use a single spelling of operators to compare expressions by tokens
+            result._expression = tuple(
+                cls.operator_aliases.get(token, token) if position % 2 else token
+                for position, token in enumerate(result._expression)
+            )
+            # resolve operators once instead of on every evaluation
+            result._steps = tuple(
+                (
+                    cls.operator_map[token],
+                    token not in cls.unguarded_operators,
+                    cls.short_circuit_map.get(token),
+                    operand,
+                )
+                for token, operand in zip(
+                    result._expression[1::2], result._expression[2::2]
+                )
             )
-            result = self._calculate(result, second, self._expression[position + 1])
         return result
+
+
+def _calculate(operation, first, second) -> Expression:
+    try:
+        return operation(first, second)
+    except (ArithmeticError, AttributeError, TypeError):
+        return Error()
@@ -1,6 +1,6 @@
 import pyparsing as pp
 
-from classad._base_expression import CompoundExpression
+from classad._base_expression import CompoundExpression, intern_expression
 from classad._expression import (
     ClassAd,
     AttributeExpression,
@@ -39,16 +39,16 @@ boolean_literal = pp.oneOf("true false", caseless=True, asKeyword=True).setParse
 error_literal = pp.CaselessKeyword("error").setParseAction(lambda: Error())
 undefined_literal = pp.CaselessKeyword("undefined").setParseAction(lambda: Undefined())
 parent_literal = pp.CaselessKeyword("parent").setParseAction(
-    lambda s, l, t: NamedExpression.from_grammar(t[0])
+    lambda s, l, t: intern_expression(NamedExpression.from_grammar(t[0]))
 )
 my_literal = pp.CaselessKeyword("my").setParseAction(
-    lambda s, l, t: NamedExpression.from_grammar(t[0])
+    lambda s, l, t: intern_expression(NamedExpression.from_grammar(t[0]))
 )
 target_literal = pp.CaselessKeyword("target").setParseAction(
-    lambda s, l, t: NamedExpression.from_grammar(t[0])
+    lambda s, l, t: intern_expression(NamedExpression.from_grammar(t[0]))
 )
 super_literal = pp.CaselessKeyword("super").setParseAction(
-    lambda s, l, t: NamedExpression.from_grammar(t[0])
+    lambda s, l, t: intern_expression(NamedExpression.from_grammar(t[0]))
 )
 
 # Tokens
@@ -117,7 +117,9 @@ literal = pp.MatchFirst(
 ).setName("literal")
 attribute_name = (
     (unquoted_name | quoted_name)("attribute_name*")
-    .setParseAction(lambda s, l, t: AttributeExpression.from_grammar(t[0]))
+    .setParseAction(
+        lambda s, l, t: intern_expression(AttributeExpression.from_grammar(t[0]))
+    )
     .setName("attribute_name")
 )
 
@@ -159,7 +161,9 @@ function_call = (
         )
         + RPAR
     )("function*")
-    .setParseAction(lambda s, l, t: FunctionExpression.from_grammar(t))
+    .setParseAction(
+        lambda s, l, t: intern_expression(FunctionExpression.from_grammar(t))
+    )
     .setName("function_call")
 )
 atom = pp.MatchFirst(
@@ -196,18 +200,24 @@ suffix_expression << pp.MatchFirst(
         pp.Group(
             "."
             + pp.delimitedList(attribute_name, ".").setParseAction(
-                lambda s, l, t: AttributeExpression.from_grammar(t)
+                lambda s, l, t: intern_expression(AttributeExpression.from_grammar(t))
             )
-        ).setParseAction(lambda s, l, t: AttributeExpression.from_grammar(t[0])),
+        ).setParseAction(
+            lambda s, l, t: intern_expression(AttributeExpression.from_grammar(t[0]))
+        ),
         pp.Group(
             subscriptable
             + pp.Suppress(".")
             + pp.delimitedList(attribute_name, ".").setParseAction(
-                lambda s, l, t: AttributeExpression.from_grammar(t)
+                lambda s, l, t: intern_expression(AttributeExpression.from_grammar(t))
             )
-        ).setParseAction(lambda s, l, t: AttributeExpression.from_grammar(t[0])),
+        ).setParseAction(
+            lambda s, l, t: intern_expression(AttributeExpression.from_grammar(t[0]))
+        ),
         pp.Group(subscriptable + LBRACKET + expression + RBRACKET).setParseAction(
-            lambda s, l, t: SubscriptableExpression.from_grammar(t[0])
+            lambda s, l, t: intern_expression(
+                SubscriptableExpression.from_grammar(t[0])
+            )
         ),
         atom,
     )
@@ -215,11 +225,11 @@ suffix_expression << pp.MatchFirst(
 
 
 def binary_parse_action(s, l, t):
-    return ArithmeticExpression.from_grammar(t[0])
+    return intern_expression(ArithmeticExpression.from_grammar(t[0]))
 
 
 def unary_parse_action(s, l, t):
-    return UnaryExpression.from_grammar(t[0])
+    return intern_expression(UnaryExpression.from_grammar(t[0]))
 
 
 # unary operators: + - ~ !
@@ -246,11 +256,15 @@ expression << pp.Group(
                 + pp.Optional(expression, default=None)("then")
                 + pp.Suppress(":")
                 + pp.Group(expression)("else")
-            ).setParseAction(lambda s, l, t: TernaryExpression.from_grammar(t)),
+            ).setParseAction(
+                lambda s, l, t: intern_expression(TernaryExpression.from_grammar(t))
+            ),
             arithmetic_expression,
         )
     )
-).setParseAction(lambda s, l, t: CompoundExpression.from_grammar(t[0])).setName(
+).setParseAction(
+    lambda s, l, t: intern_expression(CompoundExpression.from_grammar(t[0]))
+).setName(
     "expression"
 )
 
@@ -1,4 +1,4 @@
-from typing import Union
+from typing import Union, Optional, Tuple
 
 from classad._base_expression import PrimitiveExpression
 from classad._primitives import HTCBool, Undefined, Error, HTCInt, HTCFloat
@@ -50,6 +50,87 @@ def ne_operator(
     return result
 
 
+# tags of operands in the three-valued logic of the logical operators
+_FALSE, _TRUE, _UNDEFINED, _ERROR = range(4)
+#: results of ``a && b`` as ``_and_table[tag of a][tag of b]``
+_and_table = (
+    (_FALSE, _FALSE, _FALSE, _FALSE),
+    (_FALSE, _TRUE, _UNDEFINED, _ERROR),
+    (_FALSE, _UNDEFINED, _UNDEFINED, _ERROR),
+    (_ERROR, _ERROR, _ERROR, _ERROR),
+)
+#: results of ``a || b`` as ``_or_table[tag of a][tag of b]``
+_or_table = (
+    (_FALSE, _TRUE, _UNDEFINED, _ERROR),
+    (_TRUE, _TRUE, _TRUE, _TRUE),
+    (_UNDEFINED, _TRUE, _UNDEFINED, _ERROR),
+    (_ERROR, _ERROR, _ERROR, _ERROR),
+)
+_logical_values = (HTCBool(False), HTCBool(True), Undefined(), Error())
+
+
+def _logical_tag(a: PrimitiveExpression) -> int:
+    if isinstance(a, HTCBool):
+        return _TRUE if a else _FALSE
+    elif a is _logical_values[_UNDEFINED]:
+        return _UNDEFINED
+    return _ERROR
+
+
+def _fixed_results(
+    table: Tuple[Tuple[int, ...], ...]
+) -> Tuple[Optional[Union[HTCBool, Undefined, Error]], ...]:
+    """Results by tag of the first operand that do not depend on the second"""
+    return tuple(
+        _logical_values[row[0]] if row.count(row[0]) == len(row) else None
+        for row in table
+    )
+
+
+_and_fixed_results = _fixed_results(_and_table)
+_or_fixed_results = _fixed_results(_or_table)
+
+
+def and_operator(
+    a: PrimitiveExpression, b: PrimitiveExpression
+) -> Union[HTCBool, Undefined, Error]:
+    """
+    Logical and operator as defined by classad specification, i.e. the
+    three-valued logic of :py:class:`~.HTCBool` and :py:class:`~.Undefined`.
+    Operands of any other type result in :py:class:`~.Error`.
+
+    .. code:: python3
+        parse("Undefined && False").evaluate()  # result: HTCBool(False)
+        parse("Undefined && True").evaluate()  # result: Undefined
+    """
+    return _logical_values[_and_table[_logical_tag(a)][_logical_tag(b)]]
+
+
+def or_operator(
+    a: PrimitiveExpression, b: PrimitiveExpression
+) -> Union[HTCBool, Undefined, Error]:
+    """
+    Logical or operator as defined by classad specification, i.e. the
+    three-valued logic of :py:class:`~.HTCBool` and :py:class:`~.Undefined`.
+    Operands of any other type result in :py:class:`~.Error`.
+
+    .. code:: python3
+        parse("Undefined || True").evaluate()  # result: HTCBool(True)
+        parse("Undefined || False").evaluate()  # result: Undefined
+    """
+    return _logical_values[_or_table[_logical_tag(a)][_logical_tag(b)]]
+
+
+def and_short_circuit(a: PrimitiveExpression) -> Optional[Union[HTCBool, Error]]:
+    """Result of ``a && b`` if it does not depend on ``b``, otherwise :py:data:`None`"""
+    return _and_fixed_results[_logical_tag(a)]
+
+
+def or_short_circuit(a: PrimitiveExpression) -> Optional[Union[HTCBool, Error]]:
+    """Result of ``a || b`` if it does not depend on ``b``, otherwise :py:data:`None`"""
+    return _or_fixed_results[_logical_tag(a)]
+
+
 def not_operator(a: PrimitiveExpression) -> Union[HTCBool, Undefined, Error]:
     """
     Logical not operator as defined by classad specification.
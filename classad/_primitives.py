@@ -9,10 +9,20 @@ from classad._base_expression import PrimitiveExpression
 class Undefined(PrimitiveExpression):
     """
     The keyword ``UNDEFINED`` (case insensitive) represents the ``UNDEFINED`` value.
+
+    As the value has no state, there is only a single instance that can be
+    checked for by identity.
     """
 
     __slots__ = ()
 
+    __instance = None
+
+    def __new__(cls):
+        if cls.__instance is None:
+            cls.__instance = super().__new__(cls)
+        return cls.__instance
+
     def __bool__(self):
         raise TypeError
 
@@ -50,7 +60,7 @@ class Undefined(PrimitiveExpression):
     ) = __lt__ = __le__ = __ge__ = __gt__ = __rand__ = __ror__ = __htc_ne__ = __htc_eq__
 
     def __eq__(self, other: PrimitiveExpression) -> "HTCBool":
-        if type(self) == type(other):
+        if self.__class__ is other.__class__:
             return HTCBool(True)
         return HTCBool(False)
 
@@ -70,10 +80,20 @@ class Undefined(PrimitiveExpression):
 class Error(PrimitiveExpression):
     """
     The keyword ``ERROR`` (case insensitive) represents the ``ERROR`` value.
+
+    As the value has no state, there is only a single instance that can be
+    checked for by identity.
     """
 
     __slots__ = ()
 
+    __instance = None
+
+    def __new__(cls):
+        if cls.__instance is None:
+            cls.__instance = super().__new__(cls)
+        return cls.__instance
+
     def __bool__(self):
         raise TypeError
 
@@ -105,7 +125,7 @@ class Error(PrimitiveExpression):
     ) = __gt__ = __and__ = __rand__ = __or__ = __ror__ = __htc_ne__ = __htc_eq__
 
     def __eq__(self, other: PrimitiveExpression) -> "HTCBool":
-        if type(self) == type(other):
+        if self.__class__ is other.__class__:
             return HTCBool(True)
         return HTCBool(False)
 
@@ -262,12 +282,12 @@ class HTCStr(str, PrimitiveExpression):
         return result
 
     def __eq__(self, other: PrimitiveExpression) -> "HTCBool":
-        if type(self) == type(other) and super().__eq__(other):
+        if self.__class__ is other.__class__ and super().__eq__(other):
             return HTCBool(True)
         return HTCBool(False)
 
     def __ne__(self, other: PrimitiveExpression) -> "HTCBool":
-        if type(self) != type(other) or super().__ne__(other):
+        if self.__class__ is not other.__class__ or super().__ne__(other):
             return HTCBool(True)
         return HTCBool(False)
 
@@ -344,12 +364,12 @@ class HTCBool(PrimitiveExpression):
 
     def __eq__(self, other):
         return (
-            type(self) == type(other) and self._value == other._value
+            self.__class__ is other.__class__ and self._value == other._value
         ) or other is self._value
 
     def __ne__(self, other):
         return (
-            type(self) == type(other) and self._value != other._value
+            self.__class__ is other.__class__ and self._value != other._value
         ) or other is not self._value
 
     def __bool__(self):
@@ -1,8 +1,135 @@
-from classad import parse
-from classad._primitives import HTCInt
+import pytest
+
+from classad import parse, Expression
+from classad._base_expression import CompoundExpression
+from classad._expression import ClassAd
+from classad._primitives import HTCInt, HTCBool, HTCStr, Undefined, Error
 
 
 def test_simple():
     first_part = parse("my.a + 2")
     my_classad = parse("a = 4")
     assert first_part.evaluate(my=my_classad) == HTCInt(6)
+
+
+def test_chained_arithmetic():
+    assert parse("1 + 2 * 3 - 4").evaluate() == HTCInt(3)
+    assert parse("10 - 4 - 3").evaluate() == HTCInt(3)
+    assert parse("1 + undefined").evaluate() == Undefined()
+    assert parse('1 + "a"').evaluate() == Error()
+
+
+def test_absolute_reference():
+    classad = parse("[foo = 2; b = [foo = 1; d = .foo; e = [f = .b.foo]]]")
+    assert classad.evaluate(key="b.d") == HTCInt(2)
+    assert classad.evaluate(key="b.e.f") == HTCInt(1)
+
+
+def test_identity_operators():
+    assert parse('1 =?= "a"').evaluate() == HTCBool(False)
+    assert parse("undefined is undefined").evaluate() == HTCBool(True)
+    assert parse('[a = 1] isnt "a"').evaluate() == HTCBool(True)
+
+
+def test_slots():
+    classad = parse(
+        '[a = 1 + -b; b = {1, 2}[0]; c = [d = .a]; e = strcat("x", "y"); f = a ?: c.d]'
+    )
+    nodes = [classad]
+    while nodes:
+        node = nodes.pop()
+        assert not hasattr(node, "__dict__"), node
+        if isinstance(node, ClassAd):
+            nodes.extend(node.values())
+        elif isinstance(node, CompoundExpression):
+            nodes.extend(
+                element
+                for element in node._expression
+                if isinstance(element, Expression)
+            )
+
+
+@pytest.mark.parametrize(
+    "content",
+    (
+        "1 + 2 * 3 - 4",
+        "-my.a + d / 2",
+        "!(a > 3) || d == 3",
+        'strcat("x", string(b.c + d))',
+        "a > 3 ? d : 0",
+        "1 / 0",
+        "1",
+    ),
+)
+@pytest.mark.parametrize(
+    "evaluate",
+    (
+        lambda expression, my, target: expression.jit()(my=my, target=target),
+        lambda expression, my, target: expression.evaluate_batch(
+            my=my, targets=[target]
+        )[0],
+    ),
+    ids=("jit", "batch"),
+)
+def test_generated(evaluate, content):
+    my_classad = parse("""[a = 4; b = [c = a * 2]]""")
+    target_classad = parse("""[d = 3]""")
+    expression = parse(content)
+    assert evaluate(expression, my_classad, target_classad) == expression.evaluate(
+        my=my_classad, target=target_classad
+    )
+
+
+def test_generated_long_plan():
+    # Python before 3.7 does not allow more than 255 function parameters
+    rank = " + ".join(["a"] * 200)
+    my_classad = parse(f"[rank = {rank}; a = 1]")
+    expression = my_classad["rank"]
+    assert len(expression.compile()) > 255
+    assert expression.jit()(my=my_classad) == HTCInt(200)
+    assert my_classad.evaluate_batch(
+        key="rank", my=my_classad, targets=[parse("[b = 1]")]
+    ) == [HTCInt(200)]
+
+
+def test_generated_code_sharing():
+    assert parse("a + 1 < b").jit().__code__ is parse("c + 2 < d").jit().__code__
+
+
+def test_singletons():
+    assert Undefined() is Undefined()
+    assert Error() is Error()
+    assert parse("undefined").evaluate() is parse("a").evaluate(my=parse("[b = 1]"))
+
+
+def test_arithmetic_equality():
+    assert parse("a + 2 * b") == parse("a + 2 * b")
+    assert parse("1 + 2 + 3") != parse("1 + 2 + 4")
+    assert parse("1 + 2") != parse("1 - 2")
+
+
+def test_unknown_function():
+    expression = parse("foo(1)")
+    with pytest.raises(AttributeError):
+        expression.evaluate()
+
+
+def test_dot_expression():
+    expression = parse("[a = 1; b = a].b")
+    assert expression.evaluate() == HTCInt(1)
+    assert expression.evaluate() == HTCInt(1)
+    expression._expression[0]["a"] = HTCInt(2)
+    assert expression.evaluate() == HTCInt(2)
+    assert parse("[b = a; a = b].b").evaluate() == Undefined()
+    assert parse("[b = c].b").evaluate() == Undefined()
+    assert parse("[c = 5; d = [b = c].b]").evaluate(key="d") == HTCInt(5)
+
+
+def test_literal_function_arguments():
+    expression = parse('strcat("a", "b")')
+    assert expression.evaluate() is expression.evaluate()
+    expression = parse("random(1.0)")
+    assert expression.evaluate() != expression.evaluate()
+    expression = parse('strcat("a", b)')
+    assert expression.evaluate(my=parse('b = "b"')) == HTCStr("ab")
+    assert expression.evaluate(my=parse('b = "c"')) == HTCStr("ac")
@@ -187,6 +187,9 @@ class TestGrammar(object):
         assert parse("Error && Undefined").evaluate() == Error()
         assert parse("Error && Error").evaluate() == Error()
         assert parse('True && "foo"').evaluate() == Error()
+        assert parse("Undefined && 1").evaluate() == Error()
+        assert parse("1 && Undefined").evaluate() == Error()
+        assert parse("1 && 3").evaluate() == Error()
 
     def test_or(self):
         assert parse("False || False").evaluate() == HTCBool(False)
@@ -205,6 +208,24 @@ class TestGrammar(object):
         assert parse("Error || True").evaluate() == Error()
         assert parse("Error || Undefined").evaluate() == Error()
         assert parse("Error || Error").evaluate() == Error()
+        assert parse("Undefined || 1").evaluate() == Error()
+        assert parse("1 || Undefined").evaluate() == Error()
+        assert parse("1 || 3").evaluate() == Error()
+
+    def test_short_circuit(self):
+        # the second operand would fail with an IndexError if evaluated
+        assert not parse("False && {1}[5]").evaluate()
+        assert parse("True || {1}[5]").evaluate()
+        assert parse("Error && {1}[5]").evaluate() == Error()
+        assert parse("1 && True").evaluate() == Error()
+        assert parse("True && 1 || True").evaluate() == Error()
+        for content in ("False && {1}[5]", "True || {1}[5]", "1 + 2 < 1 && {1}[5]"):
+            expression = parse(content)
+            result = expression.evaluate()
+            assert expression.jit()() == result
+            assert expression.evaluate_batch(targets=[parse("[a = 1]")]) == [result]
+        expression = parse("TARGET.x > 0 && foo(1)")
+        assert expression.evaluate_batch(targets=[parse("[x = 0]")]) == [HTCBool(False)]
 
     def test_logical_not(self):
         assert not parse("!True").evaluate()
@@ -230,6 +251,15 @@ class TestGrammar(object):
         assert parse("True?:1").evaluate()
         assert parse("Undefined?:1").evaluate() == HTCInt(1)
 
+    def test_ternary_lazy(self):
+        # the branch not taken would fail with an IndexError if evaluated
+        assert parse("true?10:{1}[5]").evaluate() == HTCInt(10)
+        assert parse("false?{1}[5]:10").evaluate() == HTCInt(10)
+        assert parse("false?{1}[5]:10").jit()() == HTCInt(10)
+        assert parse("10?:{1}[5]").evaluate() == HTCInt(10)
+        assert parse("undefined?{1}[5]:{1}[5]").evaluate() == Undefined()
+        assert parse("[a = 1 > 0 ? b : {1}[5]; b = 3]").evaluate("a") == HTCInt(3)
+
     def test_subscriptable_expression(self):
         assert parse("[a=1;b={1,d,3};c=b[a];d=4]").evaluate("c") == HTCInt(4)
 
@@ -248,3 +278,12 @@ class TestGrammar(object):
         """
         assert parse(classad).evaluate("result") == HTCStr("slot15_State")
         assert parse("strcat(Undefined, 1)").evaluate() == Error()
+
+    def test_interning(self):
+        first = parse("[Requirements = TARGET.Memory >= 1024; Rank = 1]")
+        second = parse("[Requirements = TARGET.Memory >= 1024; Rank = 2]")
+        assert first["requirements"] is second["requirements"]
+        assert parse("strcat(a, (b + 1) * 2)") is parse("strcat(a, (b + 1) * 2)")
+        assert parse("1 + a") is not parse("1.0 + a")
+        assert parse('"a" + b') is not parse('"A" + b')
+        assert parse("[a = 1].a") is not parse("[a = 1].a")
@@ -1,5 +1,6 @@
 from classad import parse
-from classad._primitives import HTCInt, Undefined
+from classad._expression import ClassAd
+from classad._primitives import HTCInt, HTCStr, Undefined
 
 
 def test_simple():
@@ -47,3 +48,61 @@ def test_nested_lookup():
     assert my_classad.evaluate(
         key="rank", my=my_classad, target=target_classad
     ) == HTCInt(3)
+
+
+def test_lookup_after_modification():
+    my_classad = parse("""[a = [b = c]; c = 1]""")
+    assert my_classad.evaluate(key="a.b", my=my_classad) == HTCInt(1)
+    my_classad["a"]["c"] = HTCInt(2)
+    assert my_classad.evaluate(key="a.b", my=my_classad) == HTCInt(2)
+    del my_classad["a"]["c"]
+    assert my_classad.evaluate(key="a.b", my=my_classad) == HTCInt(1)
+
+
+def test_batch():
+    my_classad = parse(
+        """
+    requirements = TARGET.Memory >= 1024 && TARGET.Cpus >= Cpus && {true}[TARGET.Slot]
+    Cpus = 2
+    """
+    )
+    targets = [
+        parse("""[Memory = 2048; Cpus = 4; Slot = 0]"""),
+        # indexing without a Slot raises, so the requirements must short-circuit
+        parse("""[Memory = 512; Cpus = 4]"""),
+        parse("""[Cpus = 4; Slot = 0]"""),
+    ]
+    results = my_classad.evaluate_batch(
+        key="requirements", my=my_classad, targets=targets
+    )
+    assert results == [
+        my_classad.evaluate(key="requirements", my=my_classad, target=target)
+        for target in targets
+    ]
+    assert results[0]
+    assert not results[1]
+    assert results[2] == Undefined()
+
+
+def test_function_arguments():
+    my_classad = parse(
+        """
+    rank = strcat(TARGET.Name, "_", b.c)
+    b = [c = a]
+    a = "x"
+    """
+    )
+    target_classad = parse("""Name = "slot1" """)
+    assert my_classad.evaluate(
+        key="rank", my=my_classad, target=target_classad
+    ) == HTCStr("slot1_x")
+
+
+def test_lookup_survives_parsing():
+    my_classad = parse("""[a = [b = c]; c = 1]""")
+    assert my_classad.evaluate(key="a.b", my=my_classad) == HTCInt(1)
+    assert my_classad._lookups
+    parse("""[c = 2; d = [e = c]]""")
+    # the cached lookups of my_classad are still valid after parsing
+    assert my_classad._lookups_generation == ClassAd._generation
+    assert my_classad.evaluate(key="a.b", my=my_classad) == HTCInt(1)